@@ -1,28 +1,220 @@
 """命令行接口"""
 
+import functools
+import json
+import operator
 import os
+import sys
+import unicodedata
+from typing import Optional
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from types import MappingProxyType
+
 import click
-from rich.console import Console
-from rich.table import Table
 
-from .client import DNSClient
+from . import daemon
+from .client import Change, DNSClient
+
+# rich 导入较慢，首次输出时再创建 Console
+_console_instance = None
+
+
+def _console():
+    global _console_instance
+    if _console_instance is None:
+        from rich.console import Console
+
+        _console_instance = Console()
+    return _console_instance
 
-console = Console()
 
 # 默认服务商
-DEFAULT_PROVIDER = os.environ.get("DNS_PROVIDER", "aliyun")
+DEFAULT_PROVIDER = sys.intern(os.environ.get("DNS_PROVIDER", "aliyun"))
+
+# 命令别名
+_ALIASES = MappingProxyType({
+    "del": "delete",
+    "rm": "delete",
+    "set": "update",
+})
+
+# list 命令输出的列
+_ROW = operator.attrgetter("name", "type", "content", "ttl_str")
+
+# list 命令记录数超过该值时不再使用 rich 表格，直接输出对齐的纯文本
+PLAIN_THRESHOLD = 200
+
+# 输出不是终端且记录数超过该值时，直接输出 TSV
+TSV_THRESHOLD = 1000
+
+# 纯文本和 TSV 输出中需要转义的字符，TXT 记录可能包含制表符和换行
+_TEXT_ESCAPE = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+_LIST_HEADERS = ("名称", "类型", "记录值", "TTL")
+
+# bulk 命令并发处理的域名数
+BULK_WORKERS = 8
+
+# bulk 文件中 op 字段允许使用命令别名
+_BULK_OPS = {
+    "add": "add",
+    "delete": "delete",
+    "del": "delete",
+    "rm": "delete",
+    "update": "update",
+    "set": "update",
+}
+
+
+@functools.lru_cache(maxsize=4)
+def _build_client(provider: str) -> DNSClient:
+    return DNSClient(provider=provider)
 
 
 def get_client(provider: str) -> DNSClient:
-    """获取 DNS 客户端"""
+    """获取 DNS 客户端（同一服务商复用），命令结束时关闭其 lexicon 会话"""
     try:
-        return DNSClient(provider=provider)
+        client = _build_client(provider)
     except ValueError as e:
-        console.print(f"[red]错误: {e}[/red]")
+        _console().print(f"[red]错误: {e}[/red]")
         raise SystemExit(1)
 
+    click.get_current_context().call_on_close(client.close)
+    return client
+
+
+def _run_change(
+    ctx, op: str, full_domain: str, value: Optional[str], record_type: str
+) -> tuple[bool, bool]:
+    """执行单条记录变更，返回 (成功, 是否为新建)
 
-@click.group()
+    设置 XDNS_DAEMON=1 且 daemon 在运行时交给 daemon 执行，无法连接时回退到本地
+    """
+    provider = ctx.obj["provider"]
+
+    if daemon.enabled():
+        try:
+            response = daemon.request({
+                "op": op,
+                "provider": provider,
+                "full_domain": full_domain,
+                "value": value,
+                "type": record_type,
+            })
+        except daemon.DaemonUnavailable:
+            # 请求未发出，回退到本地执行
+            pass
+        else:
+            if "error" in response:
+                raise RuntimeError(response["error"])
+            return response["ok"], response.get("is_new", False)
+
+    client = get_client(provider)
+    if op == "add":
+        return client.add_record(full_domain, value, record_type), True
+    if op == "delete":
+        return client.delete_record(full_domain, record_type), False
+    return client.update_or_create(full_domain, value, record_type)
+
+
+def _display_width(text: str) -> int:
+    """终端显示宽度，全角字符占两列"""
+    if text.isascii():
+        return len(text)
+    return sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text)
+
+
+def _write_tsv(rows) -> None:
+    write = sys.stdout.buffer.write
+    for row in rows:
+        write("\t".join(cell.translate(_TEXT_ESCAPE) for cell in row).encode() + b"\n")
+    sys.stdout.buffer.flush()
+
+
+def _write_plain(rows) -> None:
+    """不经过 rich，按列宽对齐输出记录，列宽按终端显示宽度计算"""
+    rows = [tuple(cell.translate(_TEXT_ESCAPE) for cell in row) for row in rows]
+    cell_widths = [tuple(map(_display_width, row[:3])) for row in rows]
+    widths = [
+        max(_display_width(header), max(cw[i] for cw in cell_widths))
+        for i, header in enumerate(_LIST_HEADERS[:3])
+    ]
+
+    def pad(cells, cws):
+        return " ".join(
+            cell + " " * (w - cw) for cell, cw, w in zip(cells, cws, widths)
+        )
+
+    header = pad(_LIST_HEADERS[:3], map(_display_width, _LIST_HEADERS[:3]))
+    header = f"{header} {_LIST_HEADERS[3]}"
+    if sys.stdout.isatty():
+        header = f"\033[1m{header}\033[0m"
+
+    write = sys.stdout.write
+    write(header + "\n")
+    for row, cws in zip(rows, cell_widths):
+        write(f"{pad(row[:3], cws)} {row[3]}\n")
+    sys.stdout.flush()
+
+
+def _load_changes(path: str) -> list[Change]:
+    """读取 bulk 变更文件（JSON 或 YAML），每项包含 op/full_domain/value/type"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("读取 YAML 文件需要安装 PyYAML: pip install 'xdns[yaml]'") from None
+
+            entries = yaml.safe_load(f)
+        else:
+            entries = json.load(f)
+
+    if isinstance(entries, str) or not isinstance(entries, Sequence):
+        raise ValueError("变更文件的内容必须是列表")
+
+    changes = []
+    for i, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"第 {i} 项: 必须是包含 op/full_domain/value/type 的对象")
+        op = _BULK_OPS.get(str(entry.get("op", "")).lower())
+        if not op:
+            raise ValueError(f"第 {i} 项: 未知的操作类型 {entry.get('op')!r}")
+        full_domain = entry.get("full_domain")
+        if not full_domain or not isinstance(full_domain, str):
+            raise ValueError(f"第 {i} 项: 缺少 full_domain")
+        try:
+            DNSClient.parse_domain(full_domain)
+        except ValueError as e:
+            raise ValueError(f"第 {i} 项: {e}") from None
+        if op != "delete" and not entry.get("value"):
+            raise ValueError(f"第 {i} 项: 缺少 value")
+        record_type = entry.get("type", "A")
+        if not isinstance(record_type, str) or not record_type:
+            raise ValueError(f"第 {i} 项: 无效的记录类型 {record_type!r}")
+        changes.append(Change(
+            op=op,
+            full_domain=full_domain,
+            content=entry.get("value"),
+            record_type=record_type.upper(),
+        ))
+    return changes
+
+
+class _AliasedGroup(click.Group):
+    """支持命令别名的命令组，别名在查找命令时解析，不重复注册命令"""
+
+    def get_command(self, ctx, cmd_name):
+        return super().get_command(ctx, _ALIASES.get(cmd_name, cmd_name))
+
+    def resolve_command(self, ctx, args):
+        _, cmd, args = super().resolve_command(ctx, args)
+        return cmd.name if cmd else None, cmd, args
+
+
+@click.group(cls=_AliasedGroup)
 @click.version_option()
 @click.option(
     "-p", "--provider",
@@ -52,30 +244,36 @@ def list(ctx, domain: str, record_type: str):
     client = get_client(ctx.obj["provider"])
 
     try:
-        records = client.list_records(domain, record_type=record_type)
+        rows = map(_ROW, client.iter_records(domain, record_type=record_type))
+        head = tuple(islice(rows, PLAIN_THRESHOLD + 1))
     except Exception as e:
-        console.print(f"[red]错误: {e}[/red]")
+        _console().print(f"[red]错误: {e}[/red]")
         raise SystemExit(1)
 
-    if not records:
-        console.print(f"[yellow]域名 {domain} 没有解析记录[/yellow]")
+    if not head:
+        _console().print(f"[yellow]域名 {domain} 没有解析记录[/yellow]")
+        return
+
+    if len(head) > PLAIN_THRESHOLD:
+        rows = head + tuple(rows)
+        if len(rows) > TSV_THRESHOLD and not sys.stdout.isatty():
+            _write_tsv(rows)
+        else:
+            _write_plain(rows)
         return
 
-    table = Table(title=f"{domain} 解析记录")
+    from rich.table import Table
+
+    table = Table(title=f"{domain} 解析记录", show_lines=False)
     table.add_column("名称", style="cyan")
     table.add_column("类型", style="green")
     table.add_column("记录值", style="white")
     table.add_column("TTL", style="yellow")
 
-    for r in records:
-        table.add_row(
-            r["name"],
-            r["type"],
-            r["content"],
-            str(r["ttl"]) if r["ttl"] else "-",
-        )
+    for name, typ, content, ttl in head:
+        table.add_row(name, typ, content, ttl)
 
-    console.print(table)
+    _console().print(table)
 
 
 @main.command()
@@ -90,24 +288,23 @@ def add(ctx, full_domain: str, value: str, record_type: str):
         dns add www.example.com 1.2.3.4
         dns add blog.example.com cdn.example.com -t CNAME
     """
-    client = get_client(ctx.obj["provider"])
-    domain, name = client.parse_domain(full_domain)
+    domain, name = DNSClient.parse_domain(full_domain)
 
-    console.print(f"[cyan]正在添加解析记录...[/cyan]")
-    console.print(f"  域名: {domain}")
-    console.print(f"  名称: {name}")
-    console.print(f"  类型: {record_type}")
-    console.print(f"  记录值: {value}")
+    _console().print(f"[cyan]正在添加解析记录...[/cyan]")
+    _console().print(f"  域名: {domain}")
+    _console().print(f"  名称: {name}")
+    _console().print(f"  类型: {record_type}")
+    _console().print(f"  记录值: {value}")
 
     try:
-        result = client.add_record(full_domain, value, record_type)
+        result, _ = _run_change(ctx, "add", full_domain, value, record_type)
         if result:
-            console.print(f"[green]✓ 添加成功！[/green]")
+            _console().print(f"[green]✓ 添加成功！[/green]")
         else:
-            console.print(f"[red]✗ 添加失败[/red]")
+            _console().print(f"[red]✗ 添加失败[/red]")
             raise SystemExit(1)
     except Exception as e:
-        console.print(f"[red]错误: {e}[/red]")
+        _console().print(f"[red]错误: {e}[/red]")
         raise SystemExit(1)
 
 
@@ -121,20 +318,20 @@ def delete(ctx, full_domain: str, record_type: str):
     例如:
         dns delete www.example.com
         dns delete www.example.com -t AAAA
-    """
-    client = get_client(ctx.obj["provider"])
 
-    console.print(f"[cyan]正在删除 {full_domain} 的 {record_type} 记录...[/cyan]")
+    别名: del, rm
+    """
+    _console().print(f"[cyan]正在删除 {full_domain} 的 {record_type} 记录...[/cyan]")
 
     try:
-        result = client.delete_record(full_domain, record_type)
+        result, _ = _run_change(ctx, "delete", full_domain, None, record_type)
         if result:
-            console.print(f"[green]✓ 删除成功！[/green]")
+            _console().print(f"[green]✓ 删除成功！[/green]")
         else:
-            console.print(f"[red]✗ 未找到记录或删除失败[/red]")
+            _console().print(f"[red]✗ 未找到记录或删除失败[/red]")
             raise SystemExit(1)
     except Exception as e:
-        console.print(f"[red]错误: {e}[/red]")
+        _console().print(f"[red]错误: {e}[/red]")
         raise SystemExit(1)
 
 
@@ -149,30 +346,121 @@ def update(ctx, full_domain: str, value: str, record_type: str):
     例如:
         dns update www.example.com 5.6.7.8
         dns update www.example.com newcdn.example.com -t CNAME
-    """
-    client = get_client(ctx.obj["provider"])
 
-    console.print(f"[cyan]正在更新 {full_domain} 的 {record_type} 记录...[/cyan]")
+    别名: set
+    """
+    _console().print(f"[cyan]正在更新 {full_domain} 的 {record_type} 记录...[/cyan]")
 
     try:
-        success, is_new = client.update_or_create(full_domain, value, record_type)
+        success, is_new = _run_change(ctx, "update", full_domain, value, record_type)
         if success:
             if is_new:
-                console.print(f"[green]✓ 记录不存在，已创建！[/green]")
+                _console().print(f"[green]✓ 记录不存在，已创建！[/green]")
             else:
-                console.print(f"[green]✓ 更新成功！[/green]")
+                _console().print(f"[green]✓ 更新成功！[/green]")
         else:
-            console.print(f"[red]✗ 操作失败[/red]")
+            _console().print(f"[red]✗ 操作失败[/red]")
             raise SystemExit(1)
     except Exception as e:
-        console.print(f"[red]错误: {e}[/red]")
+        _console().print(f"[red]错误: {e}[/red]")
         raise SystemExit(1)
 
 
-# 添加别名
-main.add_command(delete, name="del")
-main.add_command(delete, name="rm")
-main.add_command(update, name="set")
+@main.command()
+@click.argument("changes_file", type=click.Path(exists=True, dir_okay=False))
+@click.pass_context
+def bulk(ctx, changes_file: str):
+    """批量执行变更文件中的解析记录操作
+
+    不同主域名的变更并发执行，同一主域名的变更在一个会话中按顺序执行
+
+    例如: dns bulk changes.yaml
+
+    文件格式:
+        - {op: update, full_domain: www.example.com, value: 1.2.3.4}
+        - {op: delete, full_domain: old.example.com, type: CNAME}
+    """
+    try:
+        changes = _load_changes(changes_file)
+    except Exception as e:
+        _console().print(f"[red]错误: {e}[/red]")
+        raise SystemExit(1)
+
+    client = get_client(ctx.obj["provider"])
+
+    groups: dict[str, list[Change]] = {}
+    for change in changes:
+        domain, _ = client.parse_domain(change.full_domain)
+        groups.setdefault(domain, []).append(change)
+
+    from rich.progress import Progress
+    from rich.table import Table
+
+    # 每个域名一个任务，lexicon 会话不跨线程共享
+    outcomes: dict[str, Sequence] = {}
+    with Progress(console=_console(), transient=True) as progress:
+        task = progress.add_task("正在执行变更...", total=len(groups))
+        with ThreadPoolExecutor(max_workers=BULK_WORKERS) as executor:
+            futures = {
+                executor.submit(client.bulk_apply, items): domain
+                for domain, items in groups.items()
+            }
+            for future in as_completed(futures):
+                domain = futures[future]
+                try:
+                    outcomes[domain] = future.result()
+                except Exception as e:
+                    outcomes[domain] = [e] * len(groups[domain])
+                progress.advance(task)
+
+    table = Table(title="批量变更结果")
+    table.add_column("操作", style="cyan")
+    table.add_column("域名", style="white")
+    table.add_column("类型", style="green")
+    table.add_column("结果")
+
+    failed = 0
+    for domain, items in groups.items():
+        for change, result in zip(items, outcomes[domain]):
+            if isinstance(result, Exception):
+                status = f"[red]✗ {result}[/red]"
+            elif result:
+                status = "[green]✓[/green]"
+            else:
+                status = "[red]✗ 操作失败[/red]"
+            if isinstance(result, Exception) or not result:
+                failed += 1
+            table.add_row(change.op, change.full_domain, change.record_type, status)
+
+    _console().print(table)
+
+    if failed:
+        _console().print(f"[red]{failed}/{len(changes)} 项变更失败[/red]")
+        raise SystemExit(1)
+    _console().print(f"[green]✓ 全部 {len(changes)} 项变更成功！[/green]")
+
+
+@main.command("daemon")
+@click.option(
+    "--socket", "socket_path",
+    default=daemon.DEFAULT_SOCKET_PATH,
+    envvar="XDNS_SOCKET",
+    help="Unix socket 路径，其他命令通过 XDNS_SOCKET 指定同一路径",
+)
+@click.pass_context
+def daemon_command(ctx, socket_path: str):
+    """启动后台进程，复用认证会话处理后续命令
+
+    设置 XDNS_DAEMON=1 后，add/delete/update 命令会交给 daemon 执行
+
+    例如: dns daemon
+    """
+    _console().print(f"[cyan]daemon 已启动，监听 {socket_path}[/cyan]")
+    try:
+        daemon.serve(ctx.obj["provider"], os.path.expanduser(socket_path))
+    except Exception as e:
+        _console().print(f"[red]错误: {e}[/red]")
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
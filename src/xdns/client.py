@@ -1,115 +1,503 @@
 """DNS API 客户端 (基于 dns-lexicon)"""
 
+import functools
+import json
+import math
 import os
-from typing import Optional
+import sys
+import time
+from collections import namedtuple
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterator, Optional, Union
 
-from lexicon.client import Client
-from lexicon.config import ConfigResolver
+if TYPE_CHECKING:
+    from lexicon.client import Client
+
+# 根域名的主机记录
+_AT = sys.intern("@")
+
+# 各服务商的凭证参数与环境变量对应关系
+PROVIDER_ENV_MAP = MappingProxyType({
+    "aliyun": MappingProxyType({
+        "auth_key_id": "ALIYUN_ACCESS_KEY_ID",
+        "auth_secret": "ALIYUN_ACCESS_KEY_SECRET",
+    }),
+    "cloudflare": MappingProxyType({
+        "auth_token": "CLOUDFLARE_API_TOKEN",
+    }),
+    "dnspod": MappingProxyType({
+        "auth_token": "DNSPOD_API_TOKEN",
+    }),
+})
+
+# PROVIDER_ENV_MAP 的扁平形式: 服务商 -> ((参数名, 环境变量), ...)
+_PROVIDER_ENV_TUPLES = {
+    provider: tuple(env_map.items()) for provider, env_map in PROVIDER_ENV_MAP.items()
+}
+
+# 已从环境变量读取的凭证: 服务商 -> 凭证
+_CREDENTIAL_CACHE: dict[str, dict] = {}
+
+# zone 记录缓存: (服务商, 主域名) -> (磁盘缓存文件的修改时间, 全部记录)
+_ZONE_CACHE: dict[tuple[str, str], tuple[float, list["Record"]]] = {}
+
+# find_record 未命中缓存: (服务商, 完整记录名, 记录类型) -> 过期时间 (time.monotonic)
+_MISS_CACHE: dict[tuple[str, str, str], float] = {}
+
+# 未命中缓存的最长有效期（秒）
+MISS_TTL = 60.0
+
+# 服务商接口返回这些状态码时退避重试
+RETRY_STATUS = frozenset({429, 502, 503, 504})
+
+# 创建记录不是幂等操作，网关错误时记录可能已经写入，只在限流时重试
+CREATE_RETRY_STATUS = frozenset({429})
+
+# 最多重试次数，单次等待的上限，以及一次调用累计等待的上限（秒）
+# daemon 逐个处理请求，累计等待需要明显小于客户端的超时时间
+MAX_RETRIES = 5
+MAX_BACKOFF = 30.0
+MAX_RETRY_WAIT = 30.0
+
+# 磁盘缓存目录，多个 CLI 进程之间共享
+CACHE_DIR = os.path.expanduser("~/.cache/xdns")
+
+
+# 多级公共后缀（Public Suffix List 常用子集），单级 TLD 无需列出
+_PUBLIC_SUFFIXES = (
+    # 中国
+    "com.cn", "net.cn", "org.cn", "gov.cn", "edu.cn", "ac.cn", "mil.cn",
+    "com.hk", "net.hk", "org.hk", "edu.hk", "gov.hk",
+    "com.tw", "net.tw", "org.tw", "edu.tw", "gov.tw",
+    "com.mo", "net.mo", "org.mo",
+    # 英国
+    "co.uk", "org.uk", "me.uk", "ltd.uk", "plc.uk", "net.uk", "ac.uk", "gov.uk",
+    # 澳大利亚、新西兰
+    "com.au", "net.au", "org.au", "edu.au", "gov.au", "id.au",
+    "co.nz", "net.nz", "org.nz", "ac.nz", "govt.nz",
+    # 日本、韩国
+    "co.jp", "ne.jp", "or.jp", "ac.jp", "go.jp", "ad.jp", "gr.jp",
+    "co.kr", "ne.kr", "or.kr", "go.kr", "ac.kr",
+    # 东南亚、南亚
+    "com.sg", "net.sg", "org.sg", "edu.sg", "gov.sg",
+    "com.my", "net.my", "org.my",
+    "co.th", "in.th", "or.th", "ac.th",
+    "co.id", "or.id", "web.id", "ac.id",
+    "com.ph", "net.ph", "org.ph",
+    "com.vn", "net.vn", "org.vn",
+    "co.in", "net.in", "org.in", "firm.in", "gen.in", "ind.in",
+    # 美洲
+    "com.br", "net.br", "org.br", "gov.br",
+    "com.mx", "net.mx", "org.mx",
+    "com.ar", "net.ar", "org.ar",
+    "co.za", "org.za", "net.za",
+    # 欧洲
+    "com.tr", "net.tr", "org.tr",
+    "com.ru", "net.ru", "org.ru",
+    "com.ua", "net.ua", "org.ua",
+    "co.il", "org.il", "net.il",
+)
+
+
+def _build_suffix_trie(suffixes) -> dict:
+    """按标签从右到左构建后缀树: {"cn": {"com": {}, ...}, ...}"""
+    trie: dict = {}
+    for suffix in suffixes:
+        node = trie
+        for label in reversed(suffix.split(".")):
+            node = node.setdefault(label, {})
+    return trie
+
+
+_SUFFIX_TRIE = _build_suffix_trie(_PUBLIC_SUFFIXES)
+
+
+def _load_credentials(provider: str) -> dict:
+    """从环境变量读取服务商凭证，每个服务商只读取一次"""
+    credentials = _CREDENTIAL_CACHE.get(provider)
+    if credentials is None:
+        env = os.environ
+        credentials = _CREDENTIAL_CACHE[provider] = {
+            key: value
+            for key, env_name in _PROVIDER_ENV_TUPLES.get(provider, ())
+            if (value := env.get(env_name))
+        }
+
+    if not credentials:
+        env_vars = PROVIDER_ENV_MAP.get(provider, {})
+        env_list = "\n".join(f"  {v}" for v in env_vars.values())
+        raise ValueError(
+            f"请设置 {provider} 的认证环境变量：\n{env_list}"
+        )
+    return credentials
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_cached(full_domain: str) -> tuple[str, str]:
+    domain, name = DNSClient.parse_domain(full_domain)
+    return domain, (domain if name == "@" else f"{name}.{domain}")
+
+
+def _retry_delay(
+    error: Exception, attempt: int, retry_status: frozenset = RETRY_STATUS
+) -> Optional[float]:
+    """返回重试前需要等待的秒数，不可重试的错误返回 None"""
+    response = getattr(error, "response", None)
+    if response is None or getattr(response, "status_code", None) not in retry_status:
+        return None
+
+    backoff = min(2 ** attempt, MAX_BACKOFF)
+    retry_after = response.headers.get("Retry-After") if response.headers else None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            return backoff
+        # 负数、nan、inf 等异常值不能直接传给 time.sleep
+        if math.isfinite(delay):
+            return min(max(0.0, delay), MAX_BACKOFF)
+    return backoff
+
+
+def _with_retry(retry_status: frozenset = RETRY_STATUS):
+    """服务商返回 retry_status 中的状态码时按指数退避重试，优先遵循 Retry-After
+
+    累计等待超过 MAX_RETRY_WAIT 时不再重试，直接抛出错误
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            waited = 0.0
+            for attempt in range(MAX_RETRIES):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    delay = _retry_delay(e, attempt, retry_status)
+                    if delay is None or waited + delay > MAX_RETRY_WAIT:
+                        raise
+                    time.sleep(delay)
+                    waited += delay
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class _RetryingSession:
+    """lexicon 会话包装，所有接口调用都经过 _with_retry"""
+
+    __slots__ = ("_ops",)
+
+    def __init__(self, ops):
+        self._ops = ops
+
+    @property
+    def provider(self):
+        return self._ops.provider
+
+    @_with_retry()
+    def list_records(self, **kwargs):
+        return self._ops.list_records(**kwargs)
+
+    @_with_retry(CREATE_RETRY_STATUS)
+    def create_record(self, **kwargs):
+        return self._ops.create_record(**kwargs)
+
+    @_with_retry()
+    def update_record(self, **kwargs):
+        return self._ops.update_record(**kwargs)
+
+    @_with_retry()
+    def delete_record(self, **kwargs):
+        return self._ops.delete_record(**kwargs)
+
+
+def _cache_ttl() -> float:
+    """缓存有效期（秒），通过 XDNS_CACHE_TTL 配置，0 表示禁用"""
+    try:
+        return float(os.environ.get("XDNS_CACHE_TTL", "60"))
+    except ValueError:
+        return 60.0
+
+
+class Record(namedtuple("Record", "id name type content ttl")):
+    """一条解析记录"""
+
+    __slots__ = ()
+
+    @property
+    def ttl_str(self) -> str:
+        """展示用 TTL，没有 TTL 时为 -"""
+        return str(self.ttl) if self.ttl else "-"
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+_RECORD_FIELDS = Record._fields
+
+
+@dataclass
+class Change:
+    """批量操作中的一条记录变更
+
+    op: add / delete / update（update 在记录不存在时创建）
+    """
+
+    op: str
+    full_domain: str
+    content: Optional[str] = None
+    record_type: str = "A"
 
 
 class DNSClient:
     """DNS 客户端封装，支持多种服务商"""
 
-    PROVIDER_ENV_MAP = {
-        "aliyun": {
-            "auth_key_id": "ALIYUN_ACCESS_KEY_ID",
-            "auth_secret": "ALIYUN_ACCESS_KEY_SECRET",
-        },
-        "cloudflare": {
-            "auth_token": "CLOUDFLARE_API_TOKEN",
-        },
-        "dnspod": {
-            "auth_token": "DNSPOD_API_TOKEN",
-        },
-    }
+    __slots__ = ("provider", "credentials", "_client_cache", "_session_cache", "_zone_cache")
+
+    PROVIDER_ENV_MAP = PROVIDER_ENV_MAP
 
     def __init__(
         self,
         provider: str = "aliyun",
         **credentials,
     ):
-        self.provider = provider
-        self.credentials = credentials
-
+        self.provider = sys.intern(provider)
         # 如果没传凭证，从环境变量读取
-        if not credentials and provider in self.PROVIDER_ENV_MAP:
-            env_map = self.PROVIDER_ENV_MAP[provider]
-            for key, env_name in env_map.items():
-                value = os.environ.get(env_name)
-                if value:
-                    self.credentials[key] = value
-
-        if not self.credentials:
-            env_vars = self.PROVIDER_ENV_MAP.get(provider, {})
-            env_list = "\n".join(f"  {v}" for v in env_vars.values())
-            raise ValueError(
-                f"请设置 {provider} 的认证环境变量：\n{env_list}"
-            )
+        self.credentials = credentials or dict(_load_credentials(provider))
+        self._client_cache: dict[tuple[str, str], "Client"] = {}
+        self._session_cache: dict[str, object] = {}
+        # 同一进程内的实例共享 zone 缓存
+        self._zone_cache = _ZONE_CACHE
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def parse_domain(full_domain: str) -> tuple[str, str]:
         """
         解析完整域名，返回 (主域名, 主机记录)
         例如: www.example.com -> (example.com, www)
               sub.www.example.com -> (example.com, sub.www)
               example.com -> (example.com, @)
+              www.example.co.uk -> (example.co.uk, www)
         """
-        parts = full_domain.rstrip(".").split(".")
+        end = len(full_domain)
+        while end and full_domain[end - 1] == ".":
+            end -= 1
 
-        if len(parts) < 2:
+        # 最后一个标签总是公共后缀，再沿后缀树向左匹配最长的后缀
+        dot = full_domain.rfind(".", 0, end)
+        if dot <= 0:
             raise ValueError(f"无效的域名格式: {full_domain}")
 
-        # 处理 .com.cn, .net.cn, .org.cn 等后缀
-        tld = parts[-1]
-        sld = parts[-2]
-
-        if tld == "cn" and sld in ("com", "net", "org", "gov", "edu"):
-            # 三级域名后缀
-            if len(parts) < 3:
-                return full_domain, "@"
-            domain = f"{parts[-3]}.{sld}.{tld}"
-            if len(parts) == 3:
-                rr = "@"
-            else:
-                rr = ".".join(parts[:-3])
-        else:
-            # 普通二级域名后缀
-            domain = f"{sld}.{tld}"
-            if len(parts) == 2:
-                rr = "@"
-            else:
-                rr = ".".join(parts[:-2])
-
-        return domain, rr
-
-    def _get_client(self, domain: str) -> Client:
-        """获取 lexicon 客户端"""
-        config = ConfigResolver().with_dict({
-            "provider_name": self.provider,
-            "domain": domain,
-            self.provider: self.credentials,
-        })
-        return Client(config)
+        node = _SUFFIX_TRIE.get(full_domain[dot + 1:end].lower())
+        while node:
+            prev = full_domain.rfind(".", 0, dot)
+            node = node.get(full_domain[prev + 1:dot].lower())
+            if node is None:
+                break
+            if prev < 0:
+                # 整个域名就是公共后缀，例如 com.cn
+                return full_domain[:end], _AT
+            dot = prev
+
+        # dot 为公共后缀前的分隔点，向左再取一个标签即主域名
+        start = full_domain.rfind(".", 0, dot) + 1
+        if start == 0:
+            return full_domain[:end], _AT
+        return full_domain[start:end], full_domain[:start - 1]
+
+    @staticmethod
+    def _resolve(full_domain: str) -> tuple[str, str]:
+        """解析完整域名，返回 (主域名, lexicon 使用的完整记录名)"""
+        return _resolve_cached(full_domain)
+
+    def __enter__(self) -> "DNSClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """关闭所有已打开的 lexicon 会话"""
+        sessions = self._session_cache.values()
+        self._session_cache = {}
+        self._client_cache = {}
+        for c in sessions:
+            c.provider.cleanup()
+
+    def _get_client(self, domain: str) -> "Client":
+        """获取 lexicon 客户端，同一域名复用同一个客户端"""
+        key = (self.provider, domain)
+        client = self._client_cache.get(key)
+        if client is None:
+            # lexicon 导入较慢，只在真正访问服务商时导入
+            from lexicon.client import Client
+            from lexicon.config import ConfigResolver
+
+            config = ConfigResolver().with_dict({
+                "provider_name": self.provider,
+                "domain": domain,
+                self.provider: self.credentials,
+            })
+            client = self._client_cache[key] = Client(config)
+        return client
+
+    def _session(self, domain: str):
+        """获取已认证的 lexicon 会话，同一域名只认证一次，直到 close()
+
+        认证和之后的接口调用遇到限流时自动退避重试
+        """
+        c = self._session_cache.get(domain)
+        if c is None:
+            ops = _with_retry()(self._get_client(domain).__enter__)()
+            c = self._session_cache[domain] = _RetryingSession(ops)
+        return c
+
+    @staticmethod
+    def _zone_key(domain: str) -> str:
+        """缓存使用的主域名：小写，子域名归到所属的主域名"""
+        return DNSClient.parse_domain(domain.lower())[0]
+
+    def _cache_path(self, domain: str) -> str:
+        return os.path.join(CACHE_DIR, f"{self.provider}-{domain}.json")
+
+    def _load_zone(self, domain: str) -> Optional[list[Record]]:
+        """读取未过期的 zone 缓存
+
+        以磁盘文件为准：文件被其他进程删除或重写后，内存中的副本随之失效
+        """
+        ttl = _cache_ttl()
+        if ttl <= 0:
+            return None
+
+        domain = self._zone_key(domain)
+        key = (self.provider, domain)
+        path = self._cache_path(domain)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            self._zone_cache.pop(key, None)
+            return None
+        if time.time() - mtime >= ttl:
+            return None
+
+        cached = self._zone_cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                rows = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # 每条记录按字段顺序存为数组，格式不符（如旧版本写入的对象）时视为未命中
+        if not isinstance(rows, list) or not all(
+            isinstance(r, list)
+            and len(r) == len(_RECORD_FIELDS)
+            and isinstance(r[2], str)
+            for r in rows
+        ):
+            return None
+        records = [
+            Record(id_, name, sys.intern(rtype), content, ttl)
+            for id_, name, rtype, content, ttl in rows
+        ]
+
+        self._zone_cache[key] = (mtime, records)
+        return records
+
+    def _store_zone(self, domain: str, records: list[Record]) -> None:
+        """写入 zone 缓存，磁盘写入失败时不缓存"""
+        if _cache_ttl() <= 0:
+            return
+
+        domain = self._zone_key(domain)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = self._cache_path(domain)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            self._zone_cache[(self.provider, domain)] = (os.path.getmtime(path), records)
+        except OSError:
+            pass
+
+    def invalidate_cache(self, domain: str) -> None:
+        """使指定域名的 zone 缓存失效"""
+        domain = self._zone_key(domain)
+        self._zone_cache.pop((self.provider, domain), None)
+        try:
+            os.remove(self._cache_path(domain))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _to_record(r: dict) -> Record:
+        # 记录类型取值很少（A/AAAA/CNAME/TXT...），驻留后过滤时比较可以走指针相等
+        return Record(
+            r.get("id") or "",
+            r.get("name") or "",
+            sys.intern(r.get("type") or ""),
+            r.get("content") or "",
+            r.get("ttl") or "",
+        )
+
+    @staticmethod
+    def _normalize(records: list[dict]) -> list[Record]:
+        return [DNSClient._to_record(r) for r in records]
+
+    def _fetch_zone(self, domain: str) -> list[Record]:
+        """获取整个 zone，优先使用缓存"""
+        records = self._load_zone(domain)
+        if records is None:
+            records = self._normalize(self._session(domain).list_records())
+            self._store_zone(domain, records)
+        return records
+
+    def _fetch_records(
+        self, domain: str, record_type: Optional[str] = None, name: Optional[str] = None
+    ) -> list[Record]:
+        """获取解析记录：只缓存不带过滤条件的完整列表
+
+        带过滤条件时交给服务商查询，由 lexicon 补全相对名称（如 www），
+        也避免在可能被截断的完整列表中过滤
+        """
+        if not record_type and not name:
+            return self._fetch_zone(domain)
+        return self._normalize(
+            self._session(domain).list_records(rtype=record_type, name=name)
+        )
+
+    def iter_records(
+        self, domain: str, record_type: Optional[str] = None, name: Optional[str] = None
+    ) -> Iterator[Record]:
+        """逐条返回域名的解析记录，不生成过滤后的中间列表"""
+        yield from self._fetch_records(domain, record_type, name)
 
     def list_records(
         self, domain: str, record_type: Optional[str] = None, name: Optional[str] = None
-    ) -> list[dict]:
+    ) -> list[Record]:
         """列出域名的所有解析记录"""
-        client = self._get_client(domain)
-
-        with client as c:
-            records = c.list_records(rtype=record_type, name=name)
-
-        return [
-            {
-                "id": r.get("id"),
-                "name": r.get("name", ""),
-                "type": r.get("type", ""),
-                "content": r.get("content", ""),
-                "ttl": r.get("ttl", ""),
-            }
-            for r in records
-        ]
+        return list(self.iter_records(domain, record_type, name))
+
+    def list_records_columnar(
+        self, domain: str, record_type: Optional[str] = None, name: Optional[str] = None
+    ) -> dict[str, list]:
+        """按列返回解析记录，每个字段（id/name/type/content/ttl）一个列表"""
+        records = self._fetch_records(domain, record_type, name)
+
+        return {
+            "id": [r.id for r in records],
+            "name": [r.name for r in records],
+            "type": [r.type for r in records],
+            "content": [r.content for r in records],
+            "ttl": [r.ttl for r in records],
+        }
 
     def add_record(
         self,
@@ -119,46 +507,68 @@ class DNSClient:
         ttl: Optional[int] = None,
     ) -> bool:
         """添加解析记录"""
-        domain, name = self.parse_domain(full_domain)
-        client = self._get_client(domain)
-
         # lexicon 需要完整的 name
-        if name == "@":
-            full_name = domain
-        else:
-            full_name = f"{name}.{domain}"
+        domain, full_name = self._resolve(full_domain)
+
+        c = self._session(domain)
+        result = c.create_record(rtype=record_type, name=full_name, content=content)
 
-        with client as c:
-            return c.create_record(rtype=record_type, name=full_name, content=content)
+        if result:
+            self.invalidate_cache(domain)
+            _MISS_CACHE.pop(self._miss_key(full_name, record_type), None)
+        return result
 
     def find_record(
         self, full_domain: str, record_type: str = "A"
-    ) -> Optional[dict]:
-        """查找指定的解析记录"""
-        domain, name = self.parse_domain(full_domain)
+    ) -> Optional[Record]:
+        """查找指定的解析记录，短时间内重复查找不存在的记录时直接返回 None"""
+        domain, full_name = self._resolve(full_domain)
+
+        key = self._miss_key(full_name, record_type)
+        expiry = _MISS_CACHE.get(key)
+        if expiry is not None:
+            if time.monotonic() < expiry:
+                return None
+            del _MISS_CACHE[key]
+
+        record = self.find_record_fast(domain, full_name, record_type)
+        if record is None:
+            ttl = min(_cache_ttl(), MISS_TTL)
+            if ttl > 0:
+                _MISS_CACHE[key] = time.monotonic() + ttl
+        return record
 
-        if name == "@":
-            full_name = domain
-        else:
-            full_name = f"{name}.{domain}"
+    def find_record_fast(
+        self, domain: str, full_name: str, record_type: str = "A"
+    ) -> Optional[Record]:
+        """按类型和名称让服务商过滤后查找单条记录
 
-        records = self.list_records(domain, record_type=record_type, name=full_name)
-        return records[0] if records else None
+        不使用 zone 缓存和未命中缓存：缓存的列表可能已过期，
+        部分服务商（如阿里云）不分页时也只包含第一页记录，不能据此判断记录不存在
+        """
+        return self._lookup(self._session(domain), full_name, record_type)
+
+    @staticmethod
+    def _lookup(c, full_name: str, record_type: str) -> Optional[Record]:
+        """在已打开的会话中按类型和名称查询单条记录"""
+        records = c.list_records(rtype=record_type, name=full_name)
+        return DNSClient._to_record(records[0]) if records else None
+
+    def _miss_key(self, full_name: str, record_type: str) -> tuple[str, str, str]:
+        return (self.provider, full_name.rstrip(".").lower(), record_type.upper())
 
     def delete_record(
         self, full_domain: str, record_type: str = "A", content: Optional[str] = None
     ) -> bool:
         """删除解析记录"""
-        domain, name = self.parse_domain(full_domain)
-        client = self._get_client(domain)
+        domain, full_name = self._resolve(full_domain)
 
-        if name == "@":
-            full_name = domain
-        else:
-            full_name = f"{name}.{domain}"
+        c = self._session(domain)
+        result = c.delete_record(rtype=record_type, name=full_name, content=content)
 
-        with client as c:
-            return c.delete_record(rtype=record_type, name=full_name, content=content)
+        if result:
+            self.invalidate_cache(domain)
+        return result
 
     def update_record(
         self,
@@ -167,16 +577,32 @@ class DNSClient:
         record_type: str = "A",
     ) -> bool:
         """更新解析记录"""
-        domain, name = self.parse_domain(full_domain)
-        client = self._get_client(domain)
+        domain, full_name = self._resolve(full_domain)
 
-        if name == "@":
-            full_name = domain
-        else:
-            full_name = f"{name}.{domain}"
+        c = self._session(domain)
+        result = c.update_record(rtype=record_type, name=full_name, content=content)
 
-        with client as c:
-            return c.update_record(rtype=record_type, name=full_name, content=content)
+        if result:
+            self.invalidate_cache(domain)
+            _MISS_CACHE.pop(self._miss_key(full_name, record_type), None)
+        return result
+
+    @staticmethod
+    def _upsert(
+        c, record: Optional[Record], full_name: str, content: str, record_type: str
+    ) -> tuple[bool, bool]:
+        """在已打开的会话中更新已有记录，record 为 None 时创建。返回 (成功, 是否为新建)"""
+        if record:
+            success = c.update_record(
+                identifier=record.id,
+                rtype=record_type,
+                name=full_name,
+                content=content,
+            )
+            return success, False
+
+        success = c.create_record(rtype=record_type, name=full_name, content=content)
+        return success, True
 
     def update_or_create(
         self,
@@ -184,12 +610,72 @@ class DNSClient:
         content: str,
         record_type: str = "A",
     ) -> tuple[bool, bool]:
-        """更新解析记录，不存在则创建。返回 (成功, 是否为新建)"""
-        record = self.find_record(full_domain, record_type)
+        """更新解析记录，不存在则创建。返回 (成功, 是否为新建)
 
-        if record:
-            success = self.update_record(full_domain, content, record_type)
-            return success, False
-        else:
-            success = self.add_record(full_domain, content, record_type)
-            return success, True
+        查询和修改在同一个 lexicon 会话中完成
+        """
+        domain, full_name = self._resolve(full_domain)
+
+        record = self.find_record_fast(domain, full_name, record_type)
+        success, is_new = self._upsert(
+            self._session(domain), record, full_name, content, record_type
+        )
+
+        if success:
+            self.invalidate_cache(domain)
+            _MISS_CACHE.pop(self._miss_key(full_name, record_type), None)
+        return success, is_new
+
+    def bulk_apply(self, changes: list[Change]) -> list[Union[bool, Exception]]:
+        """批量执行记录变更，按主域名分组，每个域名共用一个 lexicon 会话
+
+        返回与 changes 顺序一致的执行结果；某条变更出错时，对应位置为该异常，
+        其余变更继续执行
+        """
+        groups: dict[str, list[tuple[int, str, Change]]] = {}
+        for i, change in enumerate(changes):
+            domain, full_name = self._resolve(change.full_domain)
+            groups.setdefault(domain, []).append((i, full_name, change))
+
+        results: list[Union[bool, Exception]] = [False] * len(changes)
+        for domain, items in groups.items():
+            try:
+                c = self._session(domain)
+            except Exception as e:
+                for i, _, _ in items:
+                    results[i] = e
+                continue
+
+            try:
+                for i, full_name, change in items:
+                    try:
+                        if change.op == "add":
+                            results[i] = c.create_record(
+                                rtype=change.record_type,
+                                name=full_name,
+                                content=change.content,
+                            )
+                        elif change.op == "delete":
+                            results[i] = c.delete_record(
+                                rtype=change.record_type,
+                                name=full_name,
+                                content=change.content,
+                            )
+                        elif change.op == "update":
+                            # 每条 update 都向服务商查询，前面的变更可能已创建或删除了该记录
+                            record = self._lookup(c, full_name, change.record_type)
+                            results[i], _ = self._upsert(
+                                c, record, full_name, change.content, change.record_type
+                            )
+                        else:
+                            raise ValueError(f"未知的操作类型: {change.op}")
+                    except Exception as e:
+                        results[i] = e
+                        continue
+
+                    if results[i] and change.op != "delete":
+                        _MISS_CACHE.pop(self._miss_key(full_name, change.record_type), None)
+            finally:
+                self.invalidate_cache(domain)
+
+        return results
@@ -0,0 +1,137 @@
+"""后台常驻进程，通过 Unix socket 接收解析记录变更请求
+
+协议为一行一个 JSON：
+    请求: {"op": "update", "full_domain": "www.example.com", "value": "1.2.3.4", "type": "A"}
+    响应: {"ok": true, "is_new": false} 或 {"ok": false, "error": "..."}
+"""
+
+import json
+import os
+import socket
+import socketserver
+from typing import Optional
+
+from .client import DNSClient
+
+# 默认 socket 路径，可通过 XDNS_SOCKET 修改
+DEFAULT_SOCKET_PATH = "~/.xdns/sock"
+
+
+class DaemonUnavailable(ConnectionError):
+    """daemon 未运行，请求尚未发出"""
+
+
+def socket_path() -> str:
+    """当前使用的 socket 路径，服务端和客户端都从 XDNS_SOCKET 读取"""
+    return os.path.expanduser(os.environ.get("XDNS_SOCKET", DEFAULT_SOCKET_PATH))
+
+
+def enabled(path: Optional[str] = None) -> bool:
+    """是否通过 daemon 执行命令：设置了 XDNS_DAEMON=1 且 socket 存在"""
+    return os.environ.get("XDNS_DAEMON") == "1" and os.path.exists(path or socket_path())
+
+
+def request(payload: dict, path: Optional[str] = None, timeout: float = 60) -> dict:
+    """向 daemon 发送一条请求并等待响应
+
+    连接失败时抛出 DaemonUnavailable，此时请求未发出，可以安全地改为本地执行；
+    请求发出后的错误（如超时）抛出 ConnectionError，变更可能已经执行
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path or socket_path())
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise DaemonUnavailable(str(e)) from e
+
+        try:
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        except OSError as e:
+            raise ConnectionError(f"与 daemon 通信失败，变更可能已执行: {e}") from e
+
+    if not line:
+        raise ConnectionError("daemon 未返回结果，变更可能已执行")
+    return json.loads(line)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """daemon 服务端，按服务商复用 DNSClient 及其 lexicon 会话
+
+    请求按顺序逐个处理，lexicon 会话不会被并发使用
+    """
+
+    def __init__(self, provider: str, path: Optional[str] = None):
+        path = path or socket_path()
+        self.provider = provider
+        self.path = path
+        self.clients: dict[str, DNSClient] = {}
+
+        if os.path.exists(path):
+            try:
+                request({"op": "ping"}, path, timeout=1)
+            except OSError:
+                os.remove(path)
+            else:
+                raise RuntimeError(f"daemon 已在运行: {path}")
+
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o600)
+
+    def _get_client(self, provider: str) -> DNSClient:
+        client = self.clients.get(provider)
+        if client is None:
+            client = self.clients[provider] = DNSClient(provider=provider)
+        return client
+
+    def dispatch(self, payload: dict) -> dict:
+        op = payload.get("op")
+        if op == "ping":
+            return {"ok": True}
+
+        client = self._get_client(payload.get("provider") or self.provider)
+        full_domain = payload["full_domain"]
+        record_type = payload.get("type", "A")
+
+        if op == "add":
+            ok = client.add_record(full_domain, payload["value"], record_type)
+            return {"ok": bool(ok), "is_new": True}
+        if op == "delete":
+            ok = client.delete_record(full_domain, record_type)
+            return {"ok": bool(ok), "is_new": False}
+        if op == "update":
+            ok, is_new = client.update_or_create(full_domain, payload["value"], record_type)
+            return {"ok": bool(ok), "is_new": is_new}
+        raise ValueError(f"未知的操作类型: {op}")
+
+    def server_close(self):
+        super().server_close()
+        for client in self.clients.values():
+            client.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def serve(provider: str, path: Optional[str] = None) -> None:
+    """在前台运行 daemon，直到被中断"""
+    with DaemonServer(provider, path) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass